@@ -9,17 +9,55 @@ Fetch tardigrade nucleotide records from NCBI, write XLSX (Individuals + eDNA).
 - Baseline defaults: no region filter, no eDNA split -> large Individuals sheet.
 """
 
-import time, re, json, io, zipfile, html, datetime
-from collections import defaultdict
+import os, time, re, json, io, zipfile, html, datetime, threading, queue
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from operator import itemgetter
 from urllib.parse import urlencode
 from urllib.request import urlopen, Request
 from urllib.error import URLError, HTTPError
 import xml.etree.ElementTree as ET
 
+# Optional: lxml parses with libxml2 (C) and its iterparse can filter on the
+# record tags directly; stdlib ElementTree stays as the fallback.
+try:
+    from lxml import etree as LET
+except ImportError:
+    LET = None
+
+# Optional: NumPy turns the per-record lat/lon bounding-box compares into
+# one vectorized pass per batch.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional: requests gives pooled keep-alive connections and retry handling;
+# the urllib path below stays as the no-deps fallback.
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    requests = None
+
+# Optional: orjson parses the esearch JSON pages from bytes directly,
+# skipping the per-page UTF-8 decode the stdlib path needs.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_loads(b):
+        return json.loads(b.decode("utf-8"))
+
 # ========================== CONFIGURATION ==========================
 
 ENTREZ_EMAIL = "mab361@humboldt.edu"   # REQUIRED (NCBI policy)
 TOOL_NAME = "tardigrade_fetcher_stdlib"
+# NCBI allows 10 req/s with an API key instead of 3; export NCBI_API_KEY.
+NCBI_API_KEY = os.environ.get("NCBI_API_KEY", "")
+MAX_FETCH_WORKERS = 10 if NCBI_API_KEY else 3
 
 # Query terms
 SEARCH_TERMS = [
@@ -32,7 +70,11 @@ DB = "nucleotide"      # broader than "nuccore" -> more hits, closer to your ear
 MAX_RECORDS = 5000     # cap across all search terms
 ESARCH_PAGE = 500      # esearch page size
 EFETCH_BATCH = 100     # ids per efetch POST
-REQUEST_DELAY = 0.35   # ~3 requests/sec (NCBI-friendly)
+# usehistory=y keeps the result set on NCBI's servers and lets efetch page
+# it with WebEnv/query_key + retstart, skipping the ID download and the
+# ID-list POST bodies. Only applies with a single search term; multiple
+# terms fall back to client-side IDs so cross-term dedup still happens.
+USE_HISTORY = True
 
 # Diagnostics toggles (defined here to avoid NameError)
 PRINT_FIRST_N_IDS = 10
@@ -41,6 +83,9 @@ DEBUG_XML_LIMIT = 1
 
 # Output
 OUT_FILE = "Pacific_Marine_Tardigrades_FILLED.xlsx"
+COMPRESS_LEVEL = 1     # deflate level; 1 is ~2-3x faster than the default 6
+                       # and XLSX XML compresses almost as well. Raise for
+                       # smaller files.
 
 # Region filter (OFF by default for baseline big counts)
 REGION_FILTER_ENABLED = True
@@ -124,13 +169,108 @@ HEADERS = {
 
 DOI_RE = re.compile(r"(10\.\d{4,9}/[^\s\"<>]+)", re.IGNORECASE)
 
+# Compiled once like DOI_RE; parse_lat_lon runs per record and the re-module
+# cache lookup is measurable at that volume. One alternation covers both the
+# "46.5, -123.5" decimal form (whole string) and the "46.5 N 123.5 W"
+# hemispheric form (anywhere in the string, via the lazy prefix), so each
+# qualifier costs a single regex-engine entry.
+_LATLON = re.compile(
+    r"^\s*(?:"
+    r"(?P<d_lat>[+-]?\d+(?:\.\d+)?)\s*[,;/]\s*(?P<d_lon>[+-]?\d+(?:\.\d+)?)\s*$"
+    r"|.*?(?P<h_lat>\d+(?:\.\d+)?)\s*(?P<ns>[NSns])[^0-9\-+]+"
+    r"(?P<h_lon>\d+(?:\.\d+)?)\s*(?P<ew>[EWew])"
+    r")"
+)
+
+# ---- Keyword scanners compiled once: each record gets a single C-level
+# pass per category instead of one Python substring search per keyword.
+
+PACIFIC_TOKENS = [
+    "pacific ocean", "north pacific", "eastern pacific", "northeast pacific",
+    "california current", "west coast",
+]
+
+_MARKER_RE = re.compile(
+    r"\b(cytochrome oxidase subunit i|small subunit|large subunit"
+    r"|cox1|coi|18s|ssu|28s|lsu|its1|its2)\b"
+)
+_MARKER_MAP = {
+    "coi": "COI", "cox1": "COI", "cytochrome oxidase subunit i": "COI",
+    "18s": "18S", "small subunit": "18S", "ssu": "18S",
+    "28s": "28S", "large subunit": "28S", "lsu": "28S",
+    "its1": "ITS1",
+    "its2": "ITS2",
+}
+_EDNA_RE = re.compile("|".join(map(re.escape, EDNA_KEYWORDS)))
+_PACIFIC_RE = re.compile("|".join(map(re.escape, PACIFIC_TOKENS)))
+# Longest tokens first so "baja california sur" wins over "baja california".
+_REGION_RE = re.compile("|".join(
+    map(re.escape, sorted(set(REGION_TEXT_TOKENS), key=len, reverse=True))
+))
+
 # --------------------------- HTTP helper ---------------------------
 
+# One pooled session for every E-utilities call: keep-alive amortizes the
+# TCP/TLS handshake and Retry covers transient NCBI 429/5xx responses.
+if requests is not None:
+    SESSION = requests.Session()
+    SESSION.headers.update(HEADERS)
+    SESSION.mount("https://", HTTPAdapter(
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5,
+                          status_forcelist=[429, 500, 502, 503, 504]),
+    ))
+else:
+    SESSION = None
+
+
+class TokenBucket:
+    """Caps request rate at NCBI's actual limit (10/s with an API key,
+    3/s without) and blocks only when the budget is spent, unlike the old
+    unconditional REQUEST_DELAY sleep after every call."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.ts = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.ts) * self.rate)
+            self.ts = now
+            if self.tokens < 1.0:
+                time.sleep((1.0 - self.tokens) / self.rate)
+                self.ts = time.monotonic()
+                self.tokens = 0.0
+            else:
+                self.tokens -= 1.0
+
+
+_BUCKET = TokenBucket(10.0 if NCBI_API_KEY else 3.0)
+
+
 def http_request(base, params, method="GET", retry=3, timeout=60):
     """GET/POST wrapper with basic retry and NCBI-required params."""
+    _BUCKET.take()
     q = params.copy()
     q["email"] = ENTREZ_EMAIL
     q["tool"] = TOOL_NAME
+    if NCBI_API_KEY:
+        q["api_key"] = NCBI_API_KEY
+
+    if SESSION is not None:
+        try:
+            if method.upper() == "GET":
+                r = SESSION.get(base, params=q, timeout=timeout)
+            else:
+                r = SESSION.post(base, data=q, timeout=timeout)
+            r.raise_for_status()
+            return r.content
+        except requests.RequestException as e:
+            raise URLError(e)
+
     data = None
     url = base
     if method.upper() == "GET":
@@ -163,7 +303,7 @@ def esearch_ids(term, retmax=ESARCH_PAGE, cap=MAX_RECORDS):
             "retstart": str(retstart)
         }
         raw = http_request(base, payload, method="GET")
-        data = json.loads(raw.decode("utf-8"))
+        data = _json_loads(raw)
         lst = data.get("esearchresult", {}).get("idlist", [])
         if retstart == 0:
             total_count = int(data.get("esearchresult", {}).get("count", "0") or 0)
@@ -176,43 +316,54 @@ def esearch_ids(term, retmax=ESARCH_PAGE, cap=MAX_RECORDS):
         retstart += retmax
         if len(lst) < retmax:
             break
-        time.sleep(REQUEST_DELAY)
         if len(ids) >= cap:
             ids = ids[:cap]
             break
     return ids
 
+def esearch_history(term, cap=MAX_RECORDS):
+    """One esearch with usehistory=y; returns (webenv, query_key, count)."""
+    base = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+    payload = {
+        "db": DB,
+        "term": term,
+        "retmode": "json",
+        "retmax": "0",
+        "usehistory": "y"
+    }
+    raw = http_request(base, payload, method="GET")
+    res = _json_loads(raw).get("esearchresult", {})
+    count = int(res.get("count", "0") or 0)
+    print(f"  esearch total available: {count}")
+    return res.get("webenv", ""), res.get("querykey", ""), min(count, cap)
+
 # -------------------------- Parse helpers --------------------------
 
 def parse_lat_lon(s):
     if not s:
         return "", ""
     s = s.strip()
-    m = re.match(r"^\s*([+-]?\d+(?:\.\d+)?)\s*[,;/]\s*([+-]?\d+(?:\.\d+)?)\s*$", s)
-    if m:
-        return m.group(1), m.group(2)
-    m = re.search(r"([0-9]+(?:\.[0-9]+)?)\s*([NSns])[^0-9\-+]+([0-9]+(?:\.[0-9]+)?)\s*([EWew])", s)
-    if m:
-        lat = float(m.group(1)); ns = m.group(2).upper()
-        lon = float(m.group(3)); ew = m.group(4).upper()
-        if ns == "S": lat = -lat
-        if ew == "W": lon = -lon
-        return f"{lat}", f"{lon}"
-    return "", ""
-
-def pick_marker(definition, feature_text):
-    text = f"{definition or ''} {feature_text or ''}".lower()
+    m = _LATLON.match(s)
+    if not m:
+        return "", ""
+    d_lat = m.group("d_lat")
+    if d_lat is not None:
+        return d_lat, m.group("d_lon")
+    lat = float(m.group("h_lat")); ns = m.group("ns").upper()
+    lon = float(m.group("h_lon")); ew = m.group("ew").upper()
+    if ns == "S": lat = -lat
+    if ew == "W": lon = -lon
+    return f"{lat}", f"{lon}"
+
+def pick_marker(blob, _finditer=_MARKER_RE.finditer, _map=_MARKER_MAP):
+    """blob: lowercased locality/definition/feature text built by the caller.
+
+    The regex/table default args bind the globals once at def time so the
+    per-record calls stay on LOAD_FAST lookups.
+    """
     flags = {"COI": "", "18S": "", "28S": "", "ITS1": "", "ITS2": ""}
-    if ("coi" in text) or ("cox1" in text) or ("cytochrome oxidase subunit i" in text):
-        flags["COI"] = "X"
-    if ("18s" in text) or ("small subunit" in text) or ("ssu" in text):
-        flags["18S"] = "X"
-    if ("28s" in text) or ("large subunit" in text) or ("lsu" in text):
-        flags["28S"] = "X"
-    if "its1" in text:
-        flags["ITS1"] = "X"
-    if "its2" in text:
-        flags["ITS2"] = "X"
+    for m in _finditer(blob):
+        flags[_map[m.group(1)]] = "X"
     return flags
 
 def extract_doi_any(ref_node):
@@ -241,51 +392,80 @@ def extract_doi_any(ref_node):
     m = DOI_RE.search(" ".join(parts))
     return (m.group(1) if m else "")
 
-def detect_edna(locality, definition, feature_text, qualifier_names):
-    if not CLASSIFY_EDNA:
+def detect_edna(blob, qualifier_names,
+                _on=CLASSIFY_EDNA, _search=_EDNA_RE.search):
+    if not _on:
         return False, "off"
-    blob = f" {(locality or '')} {(definition or '')} {(feature_text or '')} ".lower()
     if "environmental_sample" in qualifier_names or "metagenomic" in qualifier_names:
         return True, "qualifier"
-    for k in EDNA_KEYWORDS:
-        if k in blob:
-            return True, "keyword"
+    if _search(blob):
+        return True, "keyword"
     return False, ""
 
-def region_match(locality, definition, feature_text, lat_raw):
-    if not REGION_FILTER_ENABLED:
+def region_match(blob, latlon_ok=False,
+                 _on=REGION_FILTER_ENABLED,
+                 _pacific=REGION_ALLOW_PACIFIC_GENERAL,
+                 _box=USE_LATLON_BOX,
+                 _pac_search=_PACIFIC_RE.search,
+                 _reg_search=_REGION_RE.search):
+    if not _on:
         return True, "disabled"
 
-    blob = f" {(locality or '')} {(definition or '')} {(feature_text or '')} ".lower()
-
     # Pacific general pass
-    if REGION_ALLOW_PACIFIC_GENERAL and any(tok in blob for tok in (
-        "pacific ocean","north pacific","eastern pacific","northeast pacific","california current","west coast"
-    )):
+    if _pacific and _pac_search(blob):
         return True, "pacific"
 
     # Token match
-    for tok in REGION_TEXT_TOKENS:
-        if tok in blob:
-            return True, "text"
-
-    # Lat/lon box fallback
-    if USE_LATLON_BOX and lat_raw:
-        lat_s, lon_s = parse_lat_lon(lat_raw)
-        if lat_s and lon_s:
-            try:
-                lat_f = float(lat_s); lon_f = float(lon_s)
-                if LAT_MIN <= lat_f <= LAT_MAX and LON_MIN <= lon_f <= LON_MAX:
-                    return True, "latlon"
-            except ValueError:
-                pass
+    if _reg_search(blob):
+        return True, "text"
+
+    # Lat/lon box fallback, precomputed for the whole batch.
+    if _box and latlon_ok:
+        return True, "latlon"
 
     return False, "none"
 
+
+def _annotate_latlon(parsed):
+    """Parse each rec's lat_lon once and mark the bounding-box result.
+
+    Stores rec["lat_s"]/rec["lon_s"] (string coordinates for the output
+    row) and rec["region_ok_latlon"]; the four box comparisons run as one
+    vectorized NumPy pass per batch when NumPy is available.
+    """
+    nan = float("nan")
+    lats, lons = [], []
+    for rec in parsed:
+        lat_s, lon_s = parse_lat_lon(rec.lat_raw)
+        rec.lat_s, rec.lon_s = lat_s, lon_s
+        try:
+            lats.append(float(lat_s))
+            lons.append(float(lon_s))
+        except ValueError:
+            lats.append(nan)
+            lons.append(nan)
+
+    if np is not None:
+        la = np.array(lats, dtype=np.float64)
+        lo = np.array(lons, dtype=np.float64)
+        mask = (
+            (la >= LAT_MIN) & (la <= LAT_MAX)
+            & (lo >= LON_MIN) & (lo <= LON_MAX)
+        ).tolist()
+    else:
+        # NaN fails every comparison, so unparsable coordinates drop out.
+        mask = [
+            LAT_MIN <= a <= LAT_MAX and LON_MIN <= b <= LON_MAX
+            for a, b in zip(lats, lons)
+        ]
+    for rec, ok in zip(parsed, mask):
+        rec.region_ok_latlon = ok
+    return parsed
+
 # ------------------------- EFetch + parsers ------------------------
 
-def efetch_records(id_batch, batch_index=1):
-    """Fetch via POST; parse INSDSeq/GBSeq; return (individual_rows, edna_rows) with region applied."""
+def efetch_raw(id_batch):
+    """POST one ID batch; returns the raw efetch XML bytes."""
     base = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
     payload = {
         "db": DB,
@@ -293,99 +473,219 @@ def efetch_records(id_batch, batch_index=1):
         "rettype": "gb",
         "retmode": "xml"
     }
-    raw = http_request(base, payload, method="POST")
-    time.sleep(REQUEST_DELAY)
+    return http_request(base, payload, method="POST")
+
+
+def efetch_raw_history(webenv, query_key, retstart, retmax):
+    """Like efetch_raw, but pages the server-side history result set."""
+    base = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+    payload = {
+        "db": DB,
+        "WebEnv": webenv,
+        "query_key": query_key,
+        "retstart": str(retstart),
+        "retmax": str(retmax),
+        "rettype": "gb",
+        "retmode": "xml"
+    }
+    return http_request(base, payload, method="POST")
 
+
+def efetch_records(id_batch, batch_index=1):
+    """Fetch via POST; parse INSDSeq/GBSeq; return (individual_rows, edna_rows) with region applied."""
+    return _records_from_raw(efetch_raw(id_batch), batch_index)
+
+
+def efetch_records_history(webenv, query_key, retstart, retmax, batch_index=1):
+    """Like efetch_records, but pages the server-side history result set."""
+    return _records_from_raw(efetch_raw_history(webenv, query_key, retstart, retmax),
+                             batch_index)
+
+
+def _records_from_raw(raw, batch_index):
     if WRITE_DEBUG_XML and batch_index <= DEBUG_XML_LIMIT:
         with open(f"debug_efetch_batch{batch_index}.xml", "wb") as f:
             f.write(raw)
         print(f"    efetch(): wrote debug_efetch_batch{batch_index}.xml ({len(raw)} bytes)")
 
-    try:
-        root = ET.fromstring(raw)
-    except ET.ParseError as e:
-        snippet = raw[:240].decode("utf-8", "ignore").replace("\n"," ")
-        print("    efetch(): XML parse error:", e, "| first bytes:", snippet)
-        return [], []
-
-    insd_list = root.findall(".//INSDSeq")
-    gbseq_list = root.findall(".//GBSeq")
-    if insd_list:
-        print(f"    efetch(): format=INSDSeq, nodes={len(insd_list)}")
-        parsed = _parse_insdseq_nodes(insd_list)
-    elif gbseq_list:
-        print(f"    efetch(): format=GBSeq, nodes={len(gbseq_list)}")
-        parsed = _parse_gbseq_nodes(gbseq_list)
+    # Stream-parse: each INSDSeq/GBSeq is handled at its end event then
+    # cleared and detached, so peak memory is one record rather than the
+    # whole multi-megabyte batch DOM. lxml additionally filters on the
+    # record tags in C so irrelevant elements never surface.
+    parsed = []
+    if LET is not None:
+        try:
+            for _event, elem in LET.iterparse(
+                io.BytesIO(raw), events=("end",), tag=("INSDSeq", "GBSeq")
+            ):
+                if elem.tag == "INSDSeq":
+                    parsed.append(_parse_insdseq_node(elem))
+                else:
+                    parsed.append(_parse_gbseq_node(elem))
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        except LET.XMLSyntaxError as e:
+            snippet = raw[:240].decode("utf-8", "ignore").replace("\n"," ")
+            print("    efetch(): XML parse error:", e, "| first bytes:", snippet)
+            return [], []
     else:
+        root = None
+        try:
+            for event, elem in ET.iterparse(io.BytesIO(raw), events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    continue
+                if elem.tag == "INSDSeq":
+                    parsed.append(_parse_insdseq_node(elem))
+                elif elem.tag == "GBSeq":
+                    parsed.append(_parse_gbseq_node(elem))
+                else:
+                    continue
+                elem.clear()
+                if root is not None:
+                    try:
+                        root.remove(elem)
+                    except ValueError:
+                        pass
+        except ET.ParseError as e:
+            snippet = raw[:240].decode("utf-8", "ignore").replace("\n"," ")
+            print("    efetch(): XML parse error:", e, "| first bytes:", snippet)
+            return [], []
+
+    if not parsed:
         print("    efetch(): no INSDSeq/GBSeq nodes")
         return [], []
+    print(f"    efetch(): parsed nodes={len(parsed)}")
 
     ind_rows, edna_rows = _build_rows_from_parsed(parsed)
     print(f"    efetch(): kept (after region) -> individuals={len(ind_rows)}, eDNA={len(edna_rows)}")
     return ind_rows, edna_rows
 
 
-def _parse_insdseq_nodes(nodes):
-    parsed = []
-    for insd in nodes:
-        rec = {
-            "accession": (insd.findtext("./INSDSeq_accession-version")
-                          or insd.findtext("./INSDSeq_primary-accession") or ""),
-            "organism": insd.findtext("./INSDSeq_organism") or "",
-            "definition": insd.findtext("./INSDSeq_definition") or "",
-            "locality": "", "lat_raw": "", "depth": "", "date": "",
-            "feature_notes": [], "qual_names": set(), "doi": ""
-        }
-        for feat in insd.findall("./INSDSeq_feature-table/INSDFeature"):
-            key = feat.findtext("./INSDFeature_key") or ""
-            for q in feat.findall("./INSDFeature_quals/INSDQualifier"):
-                name = (q.findtext("./INSDQualifier_name") or "").lower()
-                val  = q.findtext("./INSDQualifier_value") or ""
-                if key == "source":
-                    rec["qual_names"].add(name)
-                    if name == "country": rec["locality"] = val
-                    elif name in ("lat_lon","lat-lon","lat-long","latlong"): rec["lat_raw"] = val
-                    elif name == "depth": rec["depth"] = val
-                    elif name == "collection_date": rec["date"] = val
-                    elif name in {"isolation_source","note"} and val: rec["feature_notes"].append(val)
-                else:
-                    if name in {"gene","product"} and val: rec["feature_notes"].append(val)
-        refs = insd.findall("./INSDSeq_references/INSDReference")
-        if refs:
-            rec["doi"] = extract_doi_any(refs[0])
-        parsed.append(rec)
-    return parsed
-
-def _parse_gbseq_nodes(nodes):
-    parsed = []
-    for gb in nodes:
-        rec = {
-            "accession": (gb.findtext("./GBSeq_accession-version")
-                          or gb.findtext("./GBSeq_primary-accession") or ""),
-            "organism": gb.findtext("./GBSeq_organism") or "",
-            "definition": gb.findtext("./GBSeq_definition") or "",
-            "locality": "", "lat_raw": "", "depth": "", "date": "",
-            "feature_notes": [], "qual_names": set(), "doi": ""
-        }
-        for feat in gb.findall("./GBSeq_feature-table/GBFeature"):
-            key = feat.findtext("./GBFeature_key") or ""
-            for q in feat.findall("./GBFeature_quals/GBQualifier"):
-                name = (q.findtext("./GBQualifier_name") or "").lower()
-                val  = q.findtext("./GBQualifier_value") or ""
-                if key == "source":
-                    rec["qual_names"].add(name)
-                    if name == "country": rec["locality"] = val
-                    elif name in ("lat_lon","lat-lon","lat-long","latlong"): rec["lat_raw"] = val
-                    elif name == "depth": rec["depth"] = val
-                    elif name == "collection_date": rec["date"] = val
-                    elif name in {"isolation_source","note"} and val: rec["feature_notes"].append(val)
-                else:
-                    if name in {"gene","product"} and val: rec["feature_notes"].append(val)
-        refs = gb.findall("./GBSeq_references/GBReference")
-        if refs:
-            rec["doi"] = extract_doi_any(refs[0])
-        parsed.append(rec)
-    return parsed
+@dataclass(slots=True)
+class Rec:
+    """One parsed sequence record; slots keep per-record memory down and
+    turn the classifier lookups into direct attribute access."""
+    accession: str = ""
+    organism: str = ""
+    definition: str = ""
+    locality: str = ""
+    lat_raw: str = ""
+    depth: str = ""
+    date: str = ""
+    feature_notes: list = field(default_factory=list)
+    qual_names: set = field(default_factory=set)
+    doi: str = ""
+    # Filled in batch-wide by _annotate_latlon.
+    lat_s: str = ""
+    lon_s: str = ""
+    region_ok_latlon: bool = False
+
+
+def _parse_insdseq_node(insd):
+    """Parse one INSDSeq element in a single walk over its children.
+
+    Each findtext/findall re-scans the child list (and re-parses its XPath),
+    so the old ~8 calls per record walked the tree eight times; dispatching
+    on child.tag does it in one.
+    """
+    rec = Rec()
+    primary = ""
+    for child in insd:
+        tag = child.tag
+        if tag == "INSDSeq_accession-version":
+            rec.accession = child.text or ""
+        elif tag == "INSDSeq_primary-accession":
+            primary = child.text or ""
+        elif tag == "INSDSeq_organism":
+            rec.organism = child.text or ""
+        elif tag == "INSDSeq_definition":
+            rec.definition = child.text or ""
+        elif tag == "INSDSeq_feature-table":
+            for feat in child:
+                key, quals = "", None
+                for fc in feat:
+                    if fc.tag == "INSDFeature_key":
+                        key = fc.text or ""
+                    elif fc.tag == "INSDFeature_quals":
+                        quals = fc
+                if quals is None:
+                    continue
+                is_source = key == "source"
+                for q in quals:
+                    name, val = "", ""
+                    for qc in q:
+                        if qc.tag == "INSDQualifier_name":
+                            name = (qc.text or "").lower()
+                        elif qc.tag == "INSDQualifier_value":
+                            val = qc.text or ""
+                    if is_source:
+                        rec.qual_names.add(name)
+                        if name == "country": rec.locality = val
+                        elif name in ("lat_lon","lat-lon","lat-long","latlong"): rec.lat_raw = val
+                        elif name == "depth": rec.depth = val
+                        elif name == "collection_date": rec.date = val
+                        elif name in {"isolation_source","note"} and val: rec.feature_notes.append(val)
+                    else:
+                        if name in {"gene","product"} and val: rec.feature_notes.append(val)
+        elif tag == "INSDSeq_references":
+            for ref in child:
+                rec.doi = extract_doi_any(ref)
+                break
+    if not rec.accession:
+        rec.accession = primary
+    return rec
+
+def _parse_gbseq_node(gb):
+    """Parse one GBSeq element in a single walk; mirrors _parse_insdseq_node."""
+    rec = Rec()
+    primary = ""
+    for child in gb:
+        tag = child.tag
+        if tag == "GBSeq_accession-version":
+            rec.accession = child.text or ""
+        elif tag == "GBSeq_primary-accession":
+            primary = child.text or ""
+        elif tag == "GBSeq_organism":
+            rec.organism = child.text or ""
+        elif tag == "GBSeq_definition":
+            rec.definition = child.text or ""
+        elif tag == "GBSeq_feature-table":
+            for feat in child:
+                key, quals = "", None
+                for fc in feat:
+                    if fc.tag == "GBFeature_key":
+                        key = fc.text or ""
+                    elif fc.tag == "GBFeature_quals":
+                        quals = fc
+                if quals is None:
+                    continue
+                is_source = key == "source"
+                for q in quals:
+                    name, val = "", ""
+                    for qc in q:
+                        if qc.tag == "GBQualifier_name":
+                            name = (qc.text or "").lower()
+                        elif qc.tag == "GBQualifier_value":
+                            val = qc.text or ""
+                    if is_source:
+                        rec.qual_names.add(name)
+                        if name == "country": rec.locality = val
+                        elif name in ("lat_lon","lat-lon","lat-long","latlong"): rec.lat_raw = val
+                        elif name == "depth": rec.depth = val
+                        elif name == "collection_date": rec.date = val
+                        elif name in {"isolation_source","note"} and val: rec.feature_notes.append(val)
+                    else:
+                        if name in {"gene","product"} and val: rec.feature_notes.append(val)
+        elif tag == "GBSeq_references":
+            for ref in child:
+                rec.doi = extract_doi_any(ref)
+                break
+    if not rec.accession:
+        rec.accession = primary
+    return rec
 
 def _build_rows_from_parsed(parsed):
     """Return (individual_rows, eDNA_rows). Region filter applied here."""
@@ -402,50 +702,54 @@ def _build_rows_from_parsed(parsed):
     region_on     = bool(globals().get("REGION_FILTER_ENABLED", False))
     show_drops    = int(globals().get("DEBUG_SHOW_DROPS", 12))
 
-    for rec in parsed:
-        feat_text = " ".join(rec.get("feature_notes", []))
+    _annotate_latlon(parsed)
 
-        # Region decision
-        ok_region, reason = region_match(
-            rec.get("locality",""), rec.get("definition",""), feat_text, rec.get("lat_raw","")
-        )
+    # Local aliases keep the per-record calls off the module-globals dict.
+    _region_match, _detect_edna, _pick_marker = region_match, detect_edna, pick_marker
+
+    for rec in parsed:
+        feat_text = " ".join(rec.feature_notes)
+        # One lowercased blob per record, shared by every classifier below.
+        blob = (
+            f" {rec.locality} {rec.definition} {feat_text} "
+        ).lower()
+
+        # Region and eDNA decisions come first; everything below the drop
+        # check (markers, row dict) only runs for records we keep.
+        ok_region, reason = _region_match(blob, rec.region_ok_latlon)
         if ok_region and reason in reason_counts:
             reason_counts[reason] += 1
 
         # eDNA vs Individual classification (string inspect + qualifiers)
-        is_edna = False
-        try:
-            is_edna, _ = detect_edna(rec.get("locality",""), rec.get("definition",""), feat_text, rec.get("qual_names", set()))
-        except NameError:
-            pass  # detect_edna not present in this variant
+        is_edna = _detect_edna(blob, rec.qual_names)[0] if classify_edna else False
 
         # Skip early if region fails and we’re strict (handled differently for eDNA below)
         if not ok_region and not is_edna and region_on:
             drops += 1
             if len(examples) < show_drops:
                 examples.append(
-                    f"drop: {rec.get('accession','?')} | loc='{rec.get('locality','')}' | def='{(rec.get('definition') or '')[:80]}'"
+                    f"drop: {rec.accession or '?'} | loc='{rec.locality}' | def='{rec.definition[:80]}'"
                 )
             continue
 
         # Build row
-        markers = pick_marker(rec.get("definition",""), feat_text)
-        lat, lon = parse_lat_lon(rec.get("lat_raw",""))
+        markers = _pick_marker(blob)
+        acc = rec.accession
         row = {
-            "Species_ID": rec.get("organism",""),
-            "COI":  rec.get("accession","") if markers["COI"]  else "",
-            "18S":  rec.get("accession","") if markers["18S"]  else "",
-            "28S":  rec.get("accession","") if markers["28S"]  else "",
-            "ITS1": rec.get("accession","") if markers["ITS1"] else "",
-            "ITS2": rec.get("accession","") if markers["ITS2"] else "",
-            "Latitude": lat,
-            "Longitude": lon,
-            "Locality": rec.get("locality",""),
-            "Depth": rec.get("depth",""),
-            "Collection_Date": rec.get("date",""),
+            "Species_ID": rec.organism,
+            "COI":  acc if markers["COI"]  else "",
+            "18S":  acc if markers["18S"]  else "",
+            "28S":  acc if markers["28S"]  else "",
+            "ITS1": acc if markers["ITS1"] else "",
+            "ITS2": acc if markers["ITS2"] else "",
+            "Latitude": rec.lat_s,
+            "Longitude": rec.lon_s,
+            "Locality": rec.locality,
+            "Depth": rec.depth,
+            "Collection_Date": rec.date,
             "Population_Representation": "",
             "Data_Type": "eDNA" if is_edna and classify_edna else "Individual",
-            "Citation_DOI": rec.get("doi","")
+            "Citation_DOI": rec.doi
         }
 
         # Route row
@@ -457,7 +761,7 @@ def _build_rows_from_parsed(parsed):
                 drops += 1
                 if len(examples) < show_drops:
                     examples.append(
-                        f"drop(eDNA): {rec.get('accession','?')} | loc='{rec.get('locality','')}' | def='{(rec.get('definition') or '')[:80]}'"
+                        f"drop(eDNA): {rec.accession or '?'} | loc='{rec.locality}' | def='{rec.definition[:80]}'"
                     )
             continue
 
@@ -487,7 +791,6 @@ def add_population_rep(rows):
     """For Individuals, write group size if multiple records share species+locality+date+rounded coords."""
     if not COMPUTE_POPULATION_REP or not rows:
         return rows
-    counts = defaultdict(int)
     keys = []
     for r in rows:
         lat = r.get("Latitude") or ""
@@ -499,7 +802,7 @@ def add_population_rep(rows):
             lat_f, lon_f = lat, lon
         key = (r.get("Species_ID",""), r.get("Locality",""), r.get("Collection_Date",""), lat_f, lon_f)
         keys.append(key)
-        counts[key] += 1
+    counts = Counter(keys)
     for r, k in zip(rows, keys):
         n = counts[k]
         r["Population_Representation"] = str(n) if n > 1 else ""
@@ -515,24 +818,29 @@ def _col_name(idx1):
         name = chr(65 + r) + name
     return name
 
-def _sheet_xml(rows):
-    buf = io.StringIO()
-    buf.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>')
-    buf.write('<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">')
-    buf.write("<sheetData>")
+# One C-level translate pass per cell instead of html.escape's chained
+# str.replace calls; column letters precomputed once (A..AMJ covers any
+# sheet we write).
+_XML_ESC = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+_COL_NAMES = tuple(_col_name(i) for i in range(1, 1025))
+
+def _write_sheet_xml(zf, rows):
+    """Stream one worksheet's XML into an open zip member, row by row."""
+    zf.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+             b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+             b"<sheetData>")
     for r_idx, row in enumerate(rows, start=1):
-        buf.write(f'<row r="{r_idx}">')
-        for c_idx, val in enumerate(row, start=1):
-            if val is None:
-                continue
-            s = str(val)
-            if s == "":
-                continue
-            cref = f"{_col_name(c_idx)}{r_idx}"
-            buf.write(f'<c r="{cref}" t="inlineStr"><is><t xml:space="preserve">{html.escape(s, quote=True)}</t></is></c>')
-        buf.write("</row>")
-    buf.write("</sheetData></worksheet>")
-    return buf.getvalue().encode("utf-8")
+        # Most cells are empty; the `if v` prefilter drops them before any
+        # formatting work and the genexp feeds one join per row.
+        parts = [f'<row r="{r_idx}">']
+        parts.extend(
+            f'<c r="{_COL_NAMES[c_idx - 1]}{r_idx}" t="inlineStr">'
+            f'<is><t xml:space="preserve">{str(v).translate(_XML_ESC)}</t></is></c>'
+            for c_idx, v in enumerate(row, start=1) if v
+        )
+        parts.append("</row>")
+        zf.write("".join(parts).encode("utf-8"))
+    zf.write(b"</sheetData></worksheet>")
 
 def write_xlsx(path, sheets):
     """sheets: list of (sheet_name, rows) where rows is list-of-lists (row 0 is header)."""
@@ -624,7 +932,8 @@ def write_xlsx(path, sheets):
   <Application>Python (stdlib)</Application>
 </Properties>""".encode("utf-8")
 
-    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED,
+                         compresslevel=COMPRESS_LEVEL) as z:
         z.writestr("[Content_Types].xml", content_types)
         z.writestr("_rels/.rels", rels_root)
         z.writestr("xl/_rels/workbook.xml.rels", wb_rels)
@@ -633,7 +942,10 @@ def write_xlsx(path, sheets):
         z.writestr("docProps/core.xml", core)
         z.writestr("docProps/app.xml", app)
         for i, (_, rows) in enumerate(sheets, start=1):
-            z.writestr(f"xl/worksheets/sheet{i}.xml", _sheet_xml(rows))
+            # Stream each sheet straight into the archive instead of
+            # building the whole part in memory first.
+            with z.open(f"xl/worksheets/sheet{i}.xml", "w", force_zip64=True) as zf:
+                _write_sheet_xml(zf, rows)
 
 # ------------------------------- main ------------------------------
 
@@ -645,38 +957,96 @@ def main():
           f"DB={DB}; MAX_RECORDS={MAX_RECORDS}; ESARCH_PAGE={ESARCH_PAGE}; EFETCH_BATCH={EFETCH_BATCH};",
           f"RegionFilter={REGION_FILTER_ENABLED}; eDNA={CLASSIFY_EDNA}")
 
-    all_ids, seen = [], set()
-    for idx, term in enumerate(SEARCH_TERMS, 1):
-        print(f"[search {idx}/{len(SEARCH_TERMS)}] {term}")
-        ids = esearch_ids(term, retmax=ESARCH_PAGE, cap=MAX_RECORDS)
-        print(f"  -> got {len(ids)} IDs from esearch")
-        for i in ids:
-            if i not in seen:
-                seen.add(i); all_ids.append(i)
-
-    print(f"Total unique IDs: {len(all_ids)}")
-    if not all_ids:
-        print("No IDs found. Exiting.")
-        return
+    if USE_HISTORY and len(SEARCH_TERMS) == 1:
+        # Server-side paging: one esearch keeps the hit list on NCBI's end
+        # and each efetch sends only WebEnv/query_key + a window.
+        print(f"[search 1/1] {SEARCH_TERMS[0]}")
+        webenv, query_key, total = esearch_history(SEARCH_TERMS[0], cap=MAX_RECORDS)
+        print(f"Total records to fetch (history): {total}")
+        if not total or not webenv:
+            print("No IDs found. Exiting.")
+            return
+        jobs = [
+            (efetch_raw_history,
+             (webenv, query_key, s, min(EFETCH_BATCH, total - s)))
+            for s in range(0, total, EFETCH_BATCH)
+        ]
+    else:
+        # dict preserves insertion order, so this dedupes in one C-level pass
+        # per term instead of a per-ID Python loop.
+        id_map = {}
+        for idx, term in enumerate(SEARCH_TERMS, 1):
+            print(f"[search {idx}/{len(SEARCH_TERMS)}] {term}")
+            ids = esearch_ids(term, retmax=ESARCH_PAGE, cap=MAX_RECORDS)
+            print(f"  -> got {len(ids)} IDs from esearch")
+            id_map.update(dict.fromkeys(ids))
+        all_ids = list(id_map)
+
+        print(f"Total unique IDs: {len(all_ids)}")
+        if not all_ids:
+            print("No IDs found. Exiting.")
+            return
+        jobs = [
+            (efetch_raw, (all_ids[s:s + EFETCH_BATCH],))
+            for s in range(0, len(all_ids), EFETCH_BATCH)
+        ]
 
     individuals, edna = [], []
-    total_batches = (len(all_ids) + EFETCH_BATCH - 1) // EFETCH_BATCH
-    for b in range(total_batches):
-        start = b * EFETCH_BATCH
-        batch = all_ids[start:start+EFETCH_BATCH]
-        print(f"Fetching batch {b+1}/{total_batches} ({len(batch)} IDs)…")
-        ind_rows, edna_rows = efetch_records(batch, batch_index=b+1)
+    print(f"Fetching {len(jobs)} batches with {MAX_FETCH_WORKERS} workers…")
+    results = {}
+
+    # Producer/consumer handoff: fetch workers put raw XML on a bounded
+    # queue and one parse thread drains it, so the next batch is on the
+    # wire while the previous one is being parsed. maxsize bounds how many
+    # multi-MB payloads sit in memory at once.
+    raw_q = queue.Queue(maxsize=4)
+
+    def parse_worker():
+        while True:
+            item = raw_q.get()
+            if item is None:
+                break
+            b, raw = item
+            # Keep draining on any failure: if this thread died, the fetch
+            # workers would block forever on the bounded queue.
+            try:
+                results[b] = _records_from_raw(raw, b + 1)
+            except Exception as e:
+                print(f"  batch {b+1}/{len(jobs)} failed in parse: {e!r}")
+                results[b] = ([], [])
+                continue
+            done = sum(len(i) + len(e) for i, e in results.values())
+            print(f"  batch {b+1}/{len(jobs)} done; cumulative rows: {done}")
+
+    parser = threading.Thread(target=parse_worker)
+    parser.start()
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as ex:
+            futures = {
+                ex.submit(fn, *args): b
+                for b, (fn, args) in enumerate(jobs)
+            }
+            for fut in as_completed(futures):
+                raw_q.put((futures[fut], fut.result()))
+    finally:
+        raw_q.put(None)
+        parser.join()
+    # Reassemble in batch order so output ordering stays deterministic.
+    for b in range(len(jobs)):
+        ind_rows, edna_rows = results.get(b, ([], []))
         individuals.extend(ind_rows)
         edna.extend(edna_rows)
-        print(f"  cumulative rows so far: {len(individuals) + len(edna)}")
 
     if COMPUTE_POPULATION_REP:
         individuals = add_population_rep(individuals)
 
     print(f"Final counts | Individuals: {len(individuals)} | eDNA: {len(edna)}")
 
-    indiv_rows = [FIELDS] + [[r.get(k, "") for k in FIELDS] for r in individuals]
-    edna_rows  = [FIELDS] + [[r.get(k, "") for k in FIELDS] for r in edna]
+    # Every row dict is built with all FIELDS keys, so one itemgetter
+    # projects the columns in C instead of len(FIELDS) dict.get calls per row.
+    get_cols = itemgetter(*FIELDS)
+    indiv_rows = [FIELDS] + [get_cols(r) for r in individuals]
+    edna_rows  = [FIELDS] + [get_cols(r) for r in edna]
     meta = [
         ["Notes"],
         ["Dataset compiled via NCBI E-utilities (stdlib)"],